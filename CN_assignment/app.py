@@ -3,34 +3,34 @@ Excel Mock Interviewer
 A conversational system for conducting Excel technical interviews
 """
 import streamlit as st
+import streamlit.components.v1 as components
 import json
 import random
 import os
 import html
-import requests
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+import time
+import re
+import functools
+from collections import Counter, defaultdict
+from statistics import fmean
+from string import Template
+from typing import Dict, List, Any, Optional, Tuple, NamedTuple, Callable, Iterator
 from dataclasses import dataclass, field
 from enum import Enum
 
-def _format_duration(start_time):
-    """Format duration in MM:SS or HH:MM:SS format"""
-    if not start_time:
+def _format_duration(start_ns):
+    """Format duration since a perf_counter_ns() reading in MM:SS or HH:MM:SS format"""
+    if not start_ns:
         return "0:00"
-    duration = datetime.now() - start_time
-    total_seconds = int(duration.total_seconds())
-    if total_seconds < 3600:
-        minutes = total_seconds // 60
-        seconds = total_seconds % 60
-        return f"{minutes}:{seconds:02d}"
-    else:
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
-        seconds = total_seconds % 60
-        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    total_seconds = (time.perf_counter_ns() - start_ns) // 1_000_000_000
+    minutes, seconds = divmod(total_seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
 
 # Interview States
-class InterviewPhase(Enum):
+# str mixin: Streamlit re-executes this script on every rerun, redefining the enum,
+# so members must compare by value to stay equal across runs and with the cached agent
+class InterviewPhase(str, Enum):
     GREETING = "greeting"
     WARMUP = "warmup"
     CORE_SKILLS = "core_skills"
@@ -39,59 +39,357 @@ class InterviewPhase(Enum):
     WRAPUP = "wrapup"
     FEEDBACK = "feedback"
 
-@dataclass
+# Phase progression; anything not listed goes to WRAPUP for evaluation
+_NEXT_PHASE: Dict[InterviewPhase, InterviewPhase] = {
+    InterviewPhase.GREETING: InterviewPhase.WARMUP,
+    InterviewPhase.WARMUP: InterviewPhase.CORE_SKILLS,
+    InterviewPhase.CORE_SKILLS: InterviewPhase.SCENARIO_BASED,
+    InterviewPhase.SCENARIO_BASED: InterviewPhase.TROUBLESHOOTING,
+    InterviewPhase.TROUBLESHOOTING: InterviewPhase.WRAPUP,
+    InterviewPhase.WRAPUP: InterviewPhase.WRAPUP,  # Stay in WRAPUP for evaluation
+}
+
+@dataclass(slots=True)
 class InterviewMessage:
     role: str  # "interviewer" or "candidate"
     content: str
-    timestamp: datetime
+    timestamp: int  # time.perf_counter_ns()
     phase: InterviewPhase
     question_id: Optional[str] = None
     evaluation: Optional[Dict] = None
+    content_lower: str = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.content_lower = self.content.lower()
+
+@dataclass(slots=True)
+class ConversationLog:
+    """Append-only conversation history that keeps question counters up to date"""
+    messages: List[InterviewMessage] = field(default_factory=list)
+    phase_question_counts: Dict[str, int] = field(default_factory=dict)
+    total_questions: int = 0
+
+    def __iter__(self):
+        return iter(self.messages)
+
+    def __len__(self):
+        return len(self.messages)
+
+    def __getitem__(self, index):
+        return self.messages[index]
 
-@dataclass
+    def append_candidate(self, content: str, phase: InterviewPhase, timestamp: Optional[int] = None) -> InterviewMessage:
+        """Record a candidate turn, stamped now unless a clock reading is passed in"""
+        message = InterviewMessage(
+            role="candidate",
+            content=content,
+            timestamp=time.perf_counter_ns() if timestamp is None else timestamp,
+            phase=phase
+        )
+        self.messages.append(message)
+        return message
+
+    def append_interviewer(self, content: str, phase: InterviewPhase, question_id: Optional[str] = None,
+                           timestamp: Optional[int] = None) -> InterviewMessage:
+        """Record an interviewer turn, counting it if it asks a question"""
+        message = InterviewMessage(
+            role="interviewer",
+            content=content,
+            timestamp=time.perf_counter_ns() if timestamp is None else timestamp,
+            phase=phase,
+            question_id=question_id
+        )
+        self.messages.append(message)
+        if question_id:
+            self.phase_question_counts[phase.value] = self.phase_question_counts.get(phase.value, 0) + 1
+            self.total_questions += 1
+        return message
+
+    def questions_in_phase(self, phase: InterviewPhase) -> int:
+        """Number of questions asked so far in the given phase"""
+        return self.phase_question_counts.get(phase.value, 0)
+
+@dataclass(slots=True)
 class InterviewState:
     candidate_name: str
     current_phase: InterviewPhase
-    conversation_history: List[InterviewMessage]
+    conversation_history: ConversationLog = field(default_factory=ConversationLog)
     current_question: Optional[Dict] = None
-    evaluation_scores: List[Dict] = field(default_factory=list)
-    start_time: Optional[datetime] = None
+    # One entry per evaluated answer, kept as parallel lists
+    evaluation_phases: List[str] = field(default_factory=list)
+    evaluation_scores: List[float] = field(default_factory=list)
+    start_time_ns: Optional[int] = None  # monotonic clock, for durations
+    final_report: Optional[str] = None  # set once at wrap-up
     metadata: Dict = field(default_factory=dict)
 
+# Keyword tables used by the evaluators
+TECH_TERMS = frozenset({'function', 'formula', 'cell', 'range', 'data'})
+FUNCTION_TERMS = frozenset({'sum', 'count', 'average', 'vlookup', 'index', 'match',
+                            'sumif', 'countif', 'counta', 'averageif', 'sumproduct'})
+ANALYSIS_TERMS = frozenset({'pivot', 'pivottable', 'table'})
+EXAMPLE_TERMS = frozenset({'example', 'for instance', 'such as'})
+EXCEL_TERMS = frozenset({'excel', 'spreadsheet', 'worksheet', 'workbook', 'formula', 'function'})
+
+# Phase-specific terms and the points they add to technical accuracy
+PHASE_TERMS = {
+    "warmup": (2, frozenset({'experience', 'years', 'used', 'familiar'})),
+    "core_skills": (3, frozenset({'vlookup', 'index', 'match', 'sumif', 'countif'})),
+    "scenario_based": (3, frozenset({'analyze', 'pivot', 'pivottable', 'filter', 'sort'})),
+    "troubleshooting": (3, frozenset({'error', 'fix', 'debug', 'check'})),
+}
+
+SUM_TERMS = frozenset({'add', 'total', 'sum', 'sumif', 'sumproduct', 'plus', 'addition', 'calculate'})
+COUNT_TERMS = frozenset({'count', 'countif', 'counta', 'number', 'how many', 'quantity', 'item'})
+VLOOKUP_TERMS = frozenset({'lookup', 'vlookup', 'hlookup', 'xlookup', 'find', 'search', 'match', 'reference', 'table'})
+PIVOT_TERMS = frozenset({'pivot', 'pivottable', 'table', 'summarize', 'group', 'analyze', 'data'})
+TERMINOLOGY_TERMS = frozenset({'excel', 'spreadsheet', 'worksheet', 'workbook', 'cell', 'range', 'formula'})
+TECHNICAL_INDICATORS = frozenset({'function', 'formula', 'data', 'analysis', 'business', 'report'})
+CONFIDENCE_TERMS = frozenset({'i think', 'i believe', 'i would', 'i usually', 'in my experience', 'typically'})
+
+# Stems that also match any word they start (checking, fixed, filtered, dataset);
+# other terms match whole words or plurals only, so "sum" does not hit "summarize"
+STEM_TERMS = frozenset({'check', 'fix', 'debug', 'sort', 'filter', 'analyze', 'data'})
+
+# Category name -> terms; phase categories are keyed by phase value
+KEYWORD_CATEGORIES = {
+    "tech": TECH_TERMS,
+    "functions": FUNCTION_TERMS,
+    "analysis": ANALYSIS_TERMS,
+    "examples": EXAMPLE_TERMS,
+    "excel": EXCEL_TERMS,
+    **{phase: terms for phase, (_, terms) in PHASE_TERMS.items()},
+    "sum": SUM_TERMS,
+    "count": COUNT_TERMS,
+    "vlookup": VLOOKUP_TERMS,
+    "pivot": PIVOT_TERMS,
+    "terminology": TERMINOLOGY_TERMS,
+    "technical": TECHNICAL_INDICATORS,
+    "confidence": CONFIDENCE_TERMS,
+}
+
+# Rebuilt on every script run so it always reflects the tables above; re.compile's own
+# cache keeps that cheap (st.cache_resource would key on this function's source only)
+def _build_keyword_index() -> Tuple[re.Pattern, Dict[str, Tuple[str, ...]]]:
+    """Compile one pattern for every known term (or its plural) and map each term to its categories"""
+    term_categories = {}
+    for category, terms in KEYWORD_CATEGORIES.items():
+        for term in terms:
+            term_categories.setdefault(term, []).append(category)
+    
+    terms = sorted(term_categories, key=len, reverse=True)
+    alternation = "|".join(
+        re.escape(term) + (r"(?=\w*\b)" if term in STEM_TERMS else r"(?=s?\b)")
+        for term in terms
+    )
+    # Lookahead keeps matches overlapping, so "in my experience" also yields "experience"
+    pattern = re.compile(rf"\b(?=({alternation}))")
+    return pattern, {term: tuple(categories) for term, categories in term_categories.items()}
+
+KEYWORD_RE, TERM_CATEGORIES = _build_keyword_index()
+
+def _count_keywords(text_lower: str) -> Counter:
+    """Count the distinct known terms found in the lowercased text, per category"""
+    return Counter(
+        category
+        for term in set(KEYWORD_RE.findall(text_lower))
+        for category in TERM_CATEGORIES[term]
+    )
+
+class ScoringRule(NamedTuple):
+    """Points awarded when terms from a keyword category appear in a response"""
+    category: str
+    points_per_term: float
+    max_points: float
+    strength: Optional[str] = None
+    improvement: Optional[str] = None  # noted when the category is missing
+    min_terms_for_strength: int = 1
+
+# Keyword rules for the advanced evaluator
+ADVANCED_SCORING_RULES = (
+    ScoringRule("tech", 3, 3, "Uses Excel terminology correctly"),
+    ScoringRule("functions", 4, 4, "Demonstrates knowledge of Excel functions"),
+    ScoringRule("analysis", 2, 2, "Shows understanding of data analysis tools"),
+    ScoringRule("examples", 2, 2, "Provides examples"),
+    ScoringRule("excel", 1, 5, "Demonstrates Excel expertise", min_terms_for_strength=3),
+)
+
+PHASE_SCORING_RULES = {
+    phase: ScoringRule(phase, points, points)
+    for phase, (points, _) in PHASE_TERMS.items()
+}
+
+# Question topic -> rule for the basic evaluator; the first topic found in the question wins
+QUESTION_TOPIC_RULES = (
+    ("sum", ScoringRule("sum", 3.0, 3.0, "Correctly identifies SUM function purpose",
+                        "Should mention adding/totaling numbers")),
+    ("count", ScoringRule("count", 3.0, 3.0, "Understands COUNT function purpose",
+                          "Should mention counting items")),
+    ("vlookup", ScoringRule("vlookup", 3.0, 3.0, "Shows understanding of VLOOKUP concept",
+                            "Should mention looking up values in tables")),
+    ("pivot", ScoringRule("pivot", 3.0, 3.0, "Understands PivotTable functionality",
+                          "Should mention data summarization and analysis")),
+)
+
+BASIC_SCORING_RULES = (
+    ScoringRule("terminology", 0.5, 2.0, "Uses appropriate Excel terminology"),
+    ScoringRule("technical", 0.3, 1.5, "Shows technical understanding"),
+    ScoringRule("confidence", 0.5, 0.5, "Shows confidence in response"),
+)
+
+def _apply_scoring_rules(rules, keyword_counts: Counter, strengths: List[str], areas_for_improvement: List[str]) -> float:
+    """Score each rule's category once, collecting feedback along the way"""
+    points = 0
+    for rule in rules:
+        found = keyword_counts[rule.category]
+        if found:
+            points += min(found * rule.points_per_term, rule.max_points)
+            if rule.strength and found >= rule.min_terms_for_strength:
+                strengths.append(rule.strength)
+        elif rule.improvement:
+            areas_for_improvement.append(rule.improvement)
+    return points
+
+# Patterns for the canned follow-ups, matched against lowercased responses
+_NERVOUS_RE = re.compile(r"\b(?:nervous|anxious)\b")
+_GREETING_RE = re.compile(r"\b(?:hello|hi|hey)\b")
+
+# Constant prompt prefixes come first so the model backend can reuse its prefix cache
+FOLLOW_UP_PROMPT_PREFIX = """You are Sarah Chen, an Excel expert conducting a technical interview.
+
+Generate a brief, encouraging follow-up response (1-2 sentences) that:
+1. Acknowledges their answer
+2. Provides gentle feedback if needed
+3. Moves the conversation forward naturally
+
+Be professional, encouraging, and concise.
+"""
+
+REPORT_PROMPT_PREFIX = """You are Sarah Chen, an Excel expert who just conducted a technical interview.
+
+Generate a professional, encouraging final report that includes:
+1. Congratulations on completion
+2. Overall performance assessment
+3. Specific strengths identified
+4. Areas for improvement
+5. Next steps and recommendations
+
+Be encouraging but honest. Use emojis appropriately.
+Format as markdown with clear sections.
+"""
+
+# Fixed sections of the structured final report, selected by score tier
+_TIER_TEMPLATES = {
+    "excellent": (
+        "**Excellent Performance!**\n"
+        "• You demonstrate advanced Excel proficiency\n"
+        "• Strong technical knowledge and practical application\n"
+        "• Ready for senior-level Excel roles\n"
+        "• Consider pursuing Excel certification\n"
+    ),
+    "good": (
+        "**Good Performance**\n"
+        "• Solid foundation in Excel fundamentals\n"
+        "• Shows understanding of core functions\n"
+        "• Focus on advanced features (VLOOKUP, PivotTables, macros)\n"
+        "• Practice with real-world datasets\n"
+    ),
+    "developing": (
+        "**Developing Skills**\n"
+        "• Basic Excel knowledge demonstrated\n"
+        "• Focus on fundamental functions (SUM, COUNT, AVERAGE)\n"
+        "• Practice with Excel tutorials and exercises\n"
+        "• Consider Excel beginner courses\n"
+    ),
+    "learning": (
+        "**Needs Focused Learning**\n"
+        "• Start with Excel basics and fundamentals\n"
+        "• Practice with simple formulas and functions\n"
+        "• Take structured Excel training courses\n"
+        "• Build confidence with hands-on practice\n"
+    ),
+}
+
+_NEXT_STEPS_ADVANCED = (
+    "\n**Next Steps:**\n"
+    "• Practice advanced Excel features\n"
+    "• Work with complex datasets\n"
+    "• Learn Power Query and Power Pivot\n"
+)
+
+_NEXT_STEPS_FUNDAMENTALS = (
+    "\n**Next Steps:**\n"
+    "• Complete Excel fundamentals training\n"
+    "• Practice with sample datasets\n"
+    "• Focus on basic formulas and functions\n"
+)
+
+def _score_tier(score: float) -> str:
+    """Map an average score to its report tier"""
+    if score >= 8:
+        return "excellent"
+    elif score >= 6:
+        return "good"
+    elif score >= 4:
+        return "developing"
+    return "learning"
+
+@functools.lru_cache(maxsize=None)
+def _phase_display_name(phase: str) -> str:
+    """Human-readable phase name, e.g. 'core_skills' -> 'Core Skills'"""
+    return phase.replace('_', ' ').title()
+
+QUESTION_BANK_PATH = 'comprehensive_questions.json'
+
+@st.cache_resource
+def _load_question_bank_cached(path: str, mtime: float) -> Dict[str, List[Dict]]:
+    """Parse and organize the question bank once per file version"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    # Organize questions by section
+    organized_questions = {
+        "warmup": [],
+        "core_skills": [],
+        "scenario_based": [],
+        "troubleshooting": []
+    }
+    
+    for question in data.get('questions', []):
+        question["question_lower"] = question.get("question", "").lower()
+        section = question.get('section', 'warmup')
+        # Map sections to phases
+        if section == "warmup":
+            organized_questions["warmup"].append(question)
+        elif section == "core":
+            organized_questions["core_skills"].append(question)
+        elif section == "scenario":
+            organized_questions["scenario_based"].append(question)
+        elif section == "troubleshoot":
+            organized_questions["troubleshooting"].append(question)
+    
+    return organized_questions
+
 class ExcelInterviewAgent:
     def __init__(self):
         self.questions = self._load_question_bank()
+        self.question_counts = {phase: len(questions) for phase, questions in self.questions.items()}
         # Model URLs for potential future use
         self.model_url = "https://api-inference.huggingface.co/models/microsoft/DialoGPT-medium"
         self.evaluation_url = "https://api-inference.huggingface.co/models/facebook/bart-large-mnli"
+        # Without a real token every model call fails, so skip the network entirely
+        self._hf_token = os.getenv('HF_TOKEN', 'hf_demo_token')
+        self._ai_enabled = bool(self._hf_token) and self._hf_token != 'hf_demo_token'
+        # Keep-alive session shared by all model calls; created here, before any session
+        # thread can race to build it, and only when model calls are enabled
+        self._http = self._create_session() if self._ai_enabled else None
         
     def _load_question_bank(self) -> Dict[str, List[Dict]]:
         """Load questions from JSON file"""
         try:
-            with open('comprehensive_questions.json', 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Organize questions by section
-            organized_questions = {
-                "warmup": [],
-                "core_skills": [],
-                "scenario_based": [],
-                "troubleshooting": []
-            }
-            
-            for question in data.get('questions', []):
-                section = question.get('section', 'warmup')
-                # Map sections to phases
-                if section == "warmup":
-                    organized_questions["warmup"].append(question)
-                elif section == "core":
-                    organized_questions["core_skills"].append(question)
-                elif section == "scenario":
-                    organized_questions["scenario_based"].append(question)
-                elif section == "troubleshoot":
-                    organized_questions["troubleshooting"].append(question)
-            
-            return organized_questions
+            # Runs once per process through the shared agent (see _get_agent), so edits to the
+            # file need a restart or cache clear; the mtime key keeps a reload from reusing a stale parse
+            mtime = os.path.getmtime(QUESTION_BANK_PATH)
+            return _load_question_bank_cached(QUESTION_BANK_PATH, mtime)
         except FileNotFoundError:
             st.error("Question bank file not found. Using fallback questions.")
             return self._get_fallback_questions()
@@ -101,7 +399,7 @@ class ExcelInterviewAgent:
     
     def _get_fallback_questions(self) -> Dict[str, List[Dict]]:
         """Fallback questions if JSON file fails to load"""
-        return {
+        fallback_questions = {
             "warmup": [
                 {"id": "w1", "question": "What's your experience with Excel? How long have you been using it?", "type": "experience"},
                 {"id": "w2", "question": "Can you walk me through how you would sum a column of numbers?", "type": "basic"}
@@ -117,98 +415,89 @@ class ExcelInterviewAgent:
                 {"id": "t1", "question": "A VLOOKUP formula is returning #N/A. What could be causing this?", "type": "debugging"}
             ]
         }
+        for questions in fallback_questions.values():
+            for question in questions:
+                question["question_lower"] = question["question"].lower()
+        return fallback_questions
     
+    def _create_session(self):
+        """HTTP session so model calls reuse pooled TLS connections"""
+        # Imported lazily: requests is only needed when model calls are enabled
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+        # The token never changes for the agent's lifetime, so set it once on the session
+        session.headers["Authorization"] = f"Bearer {self._hf_token}"
+        return session
+
+    def _request_model(self, prompt: str, model_url: str) -> str:
+        """POST a prompt to the model; raises on failure"""
+        payload = {"inputs": prompt, "parameters": {"max_length": 200, "temperature": 0.7}}
+        # Short connect timeout so an unreachable endpoint fails fast
+        response = self._http.post(model_url, json=payload, timeout=(1, 5))
+        response.raise_for_status()
+        
+        if response.status_code == 200:
+            result = response.json()
+            if isinstance(result, list) and len(result) > 0:
+                return result[0].get("generated_text", "")
+            elif isinstance(result, dict):
+                return result.get("generated_text", "")
+        return ""
+
     def _call_ai_model(self, prompt: str, model_url: str) -> str:
         """Call external model for analysis"""
-        try:
-            headers = {"Authorization": f"Bearer {os.getenv('HF_TOKEN', 'hf_demo_token')}"}
-            payload = {"inputs": prompt, "parameters": {"max_length": 200, "temperature": 0.7}}
-            response = requests.post(model_url, headers=headers, json=payload, timeout=10)
-            
-            if response.status_code == 200:
-                result = response.json()
-                if isinstance(result, list) and len(result) > 0:
-                    return result[0].get("generated_text", "")
-                elif isinstance(result, dict):
-                    return result.get("generated_text", "")
+        if not self._ai_enabled:
             return ""
+        try:
+            # Not memoized: the agent is shared by every session and prompts carry candidate answers
+            return self._request_model(prompt, model_url)
         except Exception as e:
             print(f"Model call failed: {e}")
             return ""
 
-    def _ai_evaluate_response(self, question: Dict, response: str, phase: InterviewPhase) -> Dict:
+    def _ai_evaluate_response(self, question: Dict, message: InterviewMessage, phase: InterviewPhase) -> Dict:
         """Advanced evaluation system"""
+        keyword_counts = None
         try:
             # Scoring algorithm
-            response_lower = response.lower()
-            question_text = question.get("question", "").lower()
-            
-            # Initialize scoring components
-            technical_accuracy = 0
-            completeness = 0
-            clarity = 0
-            excel_knowledge = 0
+            response = message.content
+            keyword_counts = _count_keywords(message.content_lower)
             reasoning = []
             strengths = []
             areas_for_improvement = []
             
-            # Technical accuracy scoring
-            if any(term in response_lower for term in ['function', 'formula', 'cell', 'range', 'data']):
-                technical_accuracy += 3
-                strengths.append("Uses Excel terminology correctly")
+            # A formula entry counts as knowing Excel functions
+            if '=' in message.content_lower:
+                keyword_counts["functions"] += 1
             
-            if any(term in response_lower for term in ['=', 'sum', 'count', 'average', 'vlookup', 'index', 'match']):
-                technical_accuracy += 4
-                strengths.append("Demonstrates knowledge of Excel functions")
+            # Technical accuracy, clarity and Excel knowledge from keywords
+            total_points = _apply_scoring_rules(ADVANCED_SCORING_RULES, keyword_counts, strengths, areas_for_improvement)
             
-            if 'pivot' in response_lower or 'table' in response_lower:
-                technical_accuracy += 2
-                strengths.append("Shows understanding of data analysis tools")
+            # Phase-specific scoring
+            phase_rule = PHASE_SCORING_RULES.get(phase.value)
+            if phase_rule:
+                total_points += _apply_scoring_rules((phase_rule,), keyword_counts, strengths, areas_for_improvement)
             
             # Completeness scoring
             word_count = len(response.split())
             if word_count > 50:
-                completeness += 4
+                total_points += 4
                 strengths.append("Provides comprehensive answer")
             elif word_count > 20:
-                completeness += 2
+                total_points += 2
             else:
                 areas_for_improvement.append("Could provide more detail")
-                completeness += 1
+                total_points += 1
             
             # Clarity scoring
             if response.count('.') > 1:
-                clarity += 2
+                total_points += 2
                 strengths.append("Well-structured response")
             
-            if any(term in response_lower for term in ['example', 'for instance', 'such as']):
-                clarity += 2
-                strengths.append("Provides examples")
-            
-            # Excel knowledge scoring
-            excel_terms = ['excel', 'spreadsheet', 'worksheet', 'workbook', 'formula', 'function']
-            excel_term_count = sum(1 for term in excel_terms if term in response_lower)
-            excel_knowledge = min(5, excel_term_count)
-            
-            if excel_knowledge > 2:
-                strengths.append("Demonstrates Excel expertise")
-            
-            # Phase-specific scoring
-            if phase.value == "warmup":
-                if any(term in response_lower for term in ['experience', 'years', 'used', 'familiar']):
-                    technical_accuracy += 2
-            elif phase.value == "core_skills":
-                if any(term in response_lower for term in ['vlookup', 'index', 'match', 'sumif', 'countif']):
-                    technical_accuracy += 3
-            elif phase.value == "scenario_based":
-                if any(term in response_lower for term in ['analyze', 'pivot', 'filter', 'sort']):
-                    technical_accuracy += 3
-            elif phase.value == "troubleshooting":
-                if any(term in response_lower for term in ['error', 'fix', 'debug', 'check']):
-                    technical_accuracy += 3
-            
             # Calculate final score
-            total_score = (technical_accuracy + completeness + clarity + excel_knowledge) / 4
+            total_score = total_points / 4
             final_score = min(10, max(1, total_score))
             
             # Generate reasoning
@@ -232,13 +521,16 @@ class ExcelInterviewAgent:
                 
         except Exception as e:
             print(f"Evaluation failed: {e}")
-            return self._rule_based_evaluate_response(question, response, phase)
+            return self._rule_based_evaluate_response(question, message, phase, keyword_counts)
 
-    def _rule_based_evaluate_response(self, question: Dict, response: str, phase: InterviewPhase) -> Dict:
+    def _rule_based_evaluate_response(self, question: Dict, message: InterviewMessage, phase: InterviewPhase,
+                                      keyword_counts: Optional[Counter] = None) -> Dict:
         """Basic evaluation system"""
         try:
-            response_lower = response.lower()
-            question_text = question.get("question", "").lower()
+            response = message.content
+            question_text = question.get("question_lower", "")
+            if keyword_counts is None:
+                keyword_counts = _count_keywords(message.content_lower)
             
             # Initialize scoring
             score = 0.0
@@ -260,53 +552,12 @@ class ExcelInterviewAgent:
                 strengths.append("Provides comprehensive answer")
             
             # Technical accuracy based on question content
-            if "sum" in question_text:
-                if any(term in response_lower for term in ['add', 'total', 'sum', 'plus', 'addition', 'calculate']):
-                    score += 3.0
-                    strengths.append("Correctly identifies SUM function purpose")
-                else:
-                    areas_for_improvement.append("Should mention adding/totaling numbers")
-            
-            elif "count" in question_text:
-                if any(term in response_lower for term in ['count', 'number', 'how many', 'quantity', 'items']):
-                    score += 3.0
-                    strengths.append("Understands COUNT function purpose")
-                else:
-                    areas_for_improvement.append("Should mention counting items")
+            topic_rule = next((rule for topic, rule in QUESTION_TOPIC_RULES if topic in question_text), None)
+            if topic_rule:
+                score += _apply_scoring_rules((topic_rule,), keyword_counts, strengths, areas_for_improvement)
             
-            elif "vlookup" in question_text:
-                if any(term in response_lower for term in ['lookup', 'find', 'search', 'match', 'reference', 'table']):
-                    score += 3.0
-                    strengths.append("Shows understanding of VLOOKUP concept")
-                else:
-                    areas_for_improvement.append("Should mention looking up values in tables")
-            
-            elif "pivot" in question_text:
-                if any(term in response_lower for term in ['pivot', 'table', 'summarize', 'group', 'analyze', 'data']):
-                    score += 3.0
-                    strengths.append("Understands PivotTable functionality")
-                else:
-                    areas_for_improvement.append("Should mention data summarization and analysis")
-            
-            # Excel-specific terminology
-            excel_terms = ['excel', 'spreadsheet', 'worksheet', 'workbook', 'cell', 'range', 'formula']
-            found_excel_terms = sum(1 for term in excel_terms if term in response_lower)
-            if found_excel_terms > 0:
-                score += min(found_excel_terms * 0.5, 2.0)
-                strengths.append("Uses appropriate Excel terminology")
-            
-            # Technical depth indicators
-            technical_indicators = ['function', 'formula', 'data', 'analysis', 'business', 'report']
-            found_technical = sum(1 for term in technical_indicators if term in response_lower)
-            if found_technical > 0:
-                score += min(found_technical * 0.3, 1.5)
-                strengths.append("Shows technical understanding")
-            
-            # Confidence and experience indicators
-            confidence_indicators = ["i think", "i believe", "i would", "i usually", "in my experience", "typically"]
-            if any(indicator in response_lower for indicator in confidence_indicators):
-                score += 0.5
-                strengths.append("Shows confidence in response")
+            # Terminology, technical depth and confidence indicators
+            score += _apply_scoring_rules(BASIC_SCORING_RULES, keyword_counts, strengths, areas_for_improvement)
             
             # Ensure score is between 1-10
             score = max(1.0, min(10.0, score))
@@ -345,50 +596,48 @@ class ExcelInterviewAgent:
             return None
             
         # Count questions asked in current phase (excluding greeting)
-        question_index = len([msg for msg in state.conversation_history 
-                            if msg.phase == state.current_phase and msg.role == "interviewer" and msg.question_id])
+        question_index = state.conversation_history.questions_in_phase(state.current_phase)
         
         if question_index < len(phase_questions):
             return phase_questions[question_index]
         
         return None
     
-    def _generate_ai_follow_up(self, question: Dict, response: str, phase: InterviewPhase) -> str:
+    def _generate_ai_follow_up(self, question: Dict, message: InterviewMessage, phase: InterviewPhase) -> str:
         """AI-powered follow-up generation"""
+        if not self._ai_enabled:
+            return self._generate_follow_up(question, message, phase)
+        
+        response = message.content
         try:
-            prompt = f"""
-            You are Sarah Chen, an Excel expert conducting a technical interview.
-            
-            Previous question: {question.get('question', '')}
-            Candidate's response: {response}
-            Current interview phase: {phase.value}
-            
-            Generate a brief, encouraging follow-up response (1-2 sentences) that:
-            1. Acknowledges their answer
-            2. Provides gentle feedback if needed
-            3. Moves the conversation forward naturally
+            prompt = (
+                f"{FOLLOW_UP_PROMPT_PREFIX}\n"
+                f"Current interview phase: {phase.value}\n\n"
+                f"Previous question: {question.get('question', '')}\n"
+                f"Candidate's response: {response}\n"
+            )
             
-            Be professional, encouraging, and concise.
-            """
-            
-            ai_response = self._call_ai_model(prompt, self.ai_model_url)
+            ai_response = self._call_ai_model(prompt, self.model_url)
             if ai_response and len(ai_response.strip()) > 10:
                 return ai_response.strip()
             else:
-                return self._generate_follow_up(question, response, phase)
+                return self._generate_follow_up(question, message, phase)
                 
         except Exception as e:
             print(f"Follow-up generation failed: {e}")
-            return self._generate_follow_up(question, response, phase)
+            return self._generate_follow_up(question, message, phase)
 
-    def _generate_follow_up(self, question: Dict, response: str, phase: InterviewPhase) -> str:
+    def _generate_follow_up(self, question: Dict, message: InterviewMessage, phase: InterviewPhase) -> str:
         """Generate follow-up question (fallback)"""
+        response = message.content
+        response_lower = message.content_lower
+        
         # Handle nervous responses with empathy
-        if "nervous" in response.lower() or "anxious" in response.lower():
+        if _NERVOUS_RE.search(response_lower):
             return "I completely understand! It's totally normal to feel nervous in interviews. Don't worry, we'll take this step by step. Let's start with some basic Excel questions to get you comfortable."
         
         # Handle greeting responses - move to Excel questions immediately
-        if "hello" in response.lower() or "hi" in response.lower():
+        if _GREETING_RE.search(response_lower):
             return "Great to meet you! Let's dive right into some Excel questions. I'll start with some basics and we'll work our way up."
         
         # Handle short responses
@@ -407,35 +656,29 @@ class ExcelInterviewAgent:
     def _transition_to_next_phase(self, state: InterviewState) -> InterviewPhase:
         """Determine the next phase based on current progress"""
         # Count questions in current phase
-        questions_in_phase = len([msg for msg in state.conversation_history 
-                                if msg.phase == state.current_phase and msg.role == "interviewer"])
+        questions_in_phase = state.conversation_history.questions_in_phase(state.current_phase)
         
         
         # Question count logic is handled in process_candidate_response method
         
         # Check if we should move to next phase - only if we've asked all questions in current phase
-        current_phase_questions = self.questions.get(state.current_phase.value, [])
-        if questions_in_phase >= len(current_phase_questions) and current_phase_questions:
-            # Simple progression logic
-            if state.current_phase == InterviewPhase.GREETING:
-                return InterviewPhase.WARMUP
-            elif state.current_phase == InterviewPhase.WARMUP:
-                return InterviewPhase.CORE_SKILLS
-            elif state.current_phase == InterviewPhase.CORE_SKILLS:
-                return InterviewPhase.SCENARIO_BASED
-            elif state.current_phase == InterviewPhase.SCENARIO_BASED:
-                return InterviewPhase.TROUBLESHOOTING
-            elif state.current_phase == InterviewPhase.TROUBLESHOOTING:
-                return InterviewPhase.WRAPUP
-            elif state.current_phase == InterviewPhase.WRAPUP:
-                return InterviewPhase.WRAPUP  # Stay in WRAPUP for evaluation
-            else:
-                return InterviewPhase.WRAPUP  # Go to WRAPUP for evaluation
+        current_phase_total = self.question_counts.get(state.current_phase.value, 0)
+        if questions_in_phase >= current_phase_total and current_phase_total:
+            return _NEXT_PHASE.get(state.current_phase, InterviewPhase.WRAPUP)
         
         return state.current_phase
 
-    def _generate_ai_final_report(self, state: InterviewState, avg_score: float, phase_scores: Dict) -> str:
-        """Generate final interview report"""
+    def _generate_final_report_stream(self, state: InterviewState, avg_score: float, phase_scores: Dict) -> Iterator[str]:
+        """Yield the final interview report in chunks as it becomes available"""
+        ai_report = self._request_ai_final_report(state, avg_score, phase_scores) if self._ai_enabled else ""
+        if len(ai_report) > 50:
+            yield ai_report
+        else:
+            # Use structured report
+            yield from self._fallback_report_parts(avg_score, phase_scores, len(state.evaluation_scores))
+    
+    def _request_ai_final_report(self, state: InterviewState, avg_score: float, phase_scores: Dict) -> str:
+        """Ask the model for a final report; empty string if it fails"""
         try:
             # Create conversation summary
             conversation_summary = ""
@@ -443,119 +686,70 @@ class ExcelInterviewAgent:
                 if msg.role == "candidate":
                     conversation_summary += f"Candidate: {msg.content[:100]}...\n"
             
-            prompt = f"""
-            You are Sarah Chen, an Excel expert who just conducted a technical interview.
-            
-            Interview Summary:
-            - Candidate: {state.candidate_name}
-            - Overall Score: {avg_score:.1f}/10
-            - Questions Answered: {len(state.evaluation_scores)}
-            - Performance by Category: {phase_scores}
+            prompt = (
+                f"{REPORT_PROMPT_PREFIX}\n"
+                f"Interview Summary:\n"
+                f"- Candidate: {state.candidate_name}\n"
+                f"- Overall Score: {avg_score:.1f}/10\n"
+                f"- Questions Answered: {len(state.evaluation_scores)}\n"
+                f"- Performance by Category: {dict(phase_scores)}\n\n"
+                f"Recent Conversation:\n"
+                f"{conversation_summary}"
+            )
             
-            Recent Conversation:
-            {conversation_summary}
-            
-            Generate a professional, encouraging final report that includes:
-            1. Congratulations on completion
-            2. Overall performance assessment
-            3. Specific strengths identified
-            4. Areas for improvement
-            5. Next steps and recommendations
-            
-            Be encouraging but honest. Use emojis appropriately.
-            Format as markdown with clear sections.
-            """
-            
-            ai_report = self._call_ai_model(prompt, self.evaluation_model_url)
-            if ai_report and len(ai_report.strip()) > 50:
-                return ai_report.strip()
-            else:
-                # Use structured report
-                return self._generate_fallback_report(avg_score, phase_scores, len(state.evaluation_scores))
+            ai_report = self._call_ai_model(prompt, self.evaluation_url)
+            return ai_report.strip() if ai_report else ""
                 
         except Exception as e:
             print(f"Report generation failed: {e}")
-            return self._generate_fallback_report(avg_score, phase_scores, len(state.evaluation_scores))
+            return ""
 
-    def _generate_fallback_report(self, avg_score: float, phase_scores: Dict, total_questions: int) -> str:
-        """Generate structured report"""
-        feedback_text = f"**Interview Complete!**\n\n"
-        feedback_text += f"**Overall Score: {avg_score:.1f}/10**\n\n"
-        feedback_text += f"**Questions Answered: {total_questions}**\n\n"
+    def _fallback_report_parts(self, avg_score: float, phase_scores: Dict, total_questions: int) -> Iterator[str]:
+        """Yield the structured report section by section"""
+        yield (
+            "**Interview Complete!**\n\n"
+            f"**Overall Score: {avg_score:.1f}/10**\n\n"
+            f"**Questions Answered: {total_questions}**\n\n"
+        )
         
         if phase_scores:
-            feedback_text += "**Performance by Category:**\n"
+            yield "**Performance by Category:**\n"
             for phase, scores in phase_scores.items():
-                phase_avg = sum(scores) / len(scores) if scores else 0
-                phase_name = phase.replace('_', ' ').title()
-                feedback_text += f"• {phase_name}: {phase_avg:.1f}/10\n"
+                phase_avg = fmean(scores) if scores else 0
+                phase_name = _phase_display_name(phase)
                 
                 # Add specific feedback for each category
                 if phase_avg >= 8:
-                    feedback_text += f"  Excellent performance in {phase_name.lower()}\n"
+                    feedback = "Excellent performance"
                 elif phase_avg >= 6:
-                    feedback_text += f"  Good performance in {phase_name.lower()}\n"
+                    feedback = "Good performance"
                 else:
-                    feedback_text += f"  Needs improvement in {phase_name.lower()}\n"
+                    feedback = "Needs improvement"
+                yield f"• {phase_name}: {phase_avg:.1f}/10\n  {feedback} in {phase_name.lower()}\n"
         
-        feedback_text += f"\n**Detailed Assessment:**\n"
-        if avg_score >= 8:
-            feedback_text += "**Excellent Performance!**\n"
-            feedback_text += "• You demonstrate advanced Excel proficiency\n"
-            feedback_text += "• Strong technical knowledge and practical application\n"
-            feedback_text += "• Ready for senior-level Excel roles\n"
-            feedback_text += "• Consider pursuing Excel certification\n"
-        elif avg_score >= 6:
-            feedback_text += "**Good Performance**\n"
-            feedback_text += "• Solid foundation in Excel fundamentals\n"
-            feedback_text += "• Shows understanding of core functions\n"
-            feedback_text += "• Focus on advanced features (VLOOKUP, PivotTables, macros)\n"
-            feedback_text += "• Practice with real-world datasets\n"
-        elif avg_score >= 4:
-            feedback_text += "**Developing Skills**\n"
-            feedback_text += "• Basic Excel knowledge demonstrated\n"
-            feedback_text += "• Focus on fundamental functions (SUM, COUNT, AVERAGE)\n"
-            feedback_text += "• Practice with Excel tutorials and exercises\n"
-            feedback_text += "• Consider Excel beginner courses\n"
-        else:
-            feedback_text += "**Needs Focused Learning**\n"
-            feedback_text += "• Start with Excel basics and fundamentals\n"
-            feedback_text += "• Practice with simple formulas and functions\n"
-            feedback_text += "• Take structured Excel training courses\n"
-            feedback_text += "• Build confidence with hands-on practice\n"
-        
-        feedback_text += f"\n**Next Steps:**\n"
-        if avg_score >= 6:
-            feedback_text += "• Practice advanced Excel features\n"
-            feedback_text += "• Work with complex datasets\n"
-            feedback_text += "• Learn Power Query and Power Pivot\n"
-        else:
-            feedback_text += "• Complete Excel fundamentals training\n"
-            feedback_text += "• Practice with sample datasets\n"
-            feedback_text += "• Focus on basic formulas and functions\n"
-            
-        return feedback_text
+        yield "\n**Detailed Assessment:**\n"
+        yield _TIER_TEMPLATES[_score_tier(avg_score)]
+        yield _NEXT_STEPS_ADVANCED if avg_score >= 6 else _NEXT_STEPS_FUNDAMENTALS
     
-    def process_candidate_response(self, state: InterviewState, response: str) -> InterviewState:
-        """Process candidate's response and generate interviewer's next message"""
+    def process_candidate_response(self, state: InterviewState, response: str,
+                                   write_report: Callable[[Iterator[str]], str] = "".join) -> InterviewState:
+        """Process candidate's response and generate interviewer's next message
+        
+        write_report consumes the final report chunks and returns the full text;
+        the UI passes st.empty().write_stream so the report appears as it streams.
+        """
+        
+        # One clock read stamps every message added this turn
+        now_ns = time.perf_counter_ns()
         
         # Add candidate's response to conversation
-        candidate_message = InterviewMessage(
-            role="candidate",
-            content=response,
-            timestamp=datetime.now(),
-            phase=state.current_phase
-        )
-        state.conversation_history.append(candidate_message)
+        candidate_message = state.conversation_history.append_candidate(response, state.current_phase, timestamp=now_ns)
         
         # Evaluate the response if it's answering a question (store for later, don't show now)
         if state.current_question:
-            evaluation = self._ai_evaluate_response(state.current_question, response, state.current_phase)
-            state.evaluation_scores.append({
-                "question_id": state.current_question["id"],
-                "score": evaluation["score"],
-                "phase": state.current_phase.value
-            })
+            evaluation = self._ai_evaluate_response(state.current_question, candidate_message, state.current_phase)
+            state.evaluation_phases.append(state.current_phase.value)
+            state.evaluation_scores.append(evaluation["score"])
             # Don't show evaluation immediately - will show at the end
             # Clear current question after processing response
             state.current_question = None
@@ -570,14 +764,12 @@ class ExcelInterviewAgent:
             next_question = self._get_next_question(state)
             if next_question:
                 state.current_question = next_question
-                question_message = InterviewMessage(
-                    role="interviewer",
-                    content=next_question["question"],
-                    timestamp=datetime.now(),
-                    phase=state.current_phase,
-                    question_id=next_question["id"]
+                state.conversation_history.append_interviewer(
+                    next_question["question"],
+                    state.current_phase,
+                    question_id=next_question["id"],
+                    timestamp=now_ns
                 )
-                state.conversation_history.append(question_message)
             else:
                 # If no more questions in current phase, move to next phase
                 # This will be handled by the phase transition logic below
@@ -586,8 +778,7 @@ class ExcelInterviewAgent:
         # Check if we should move to next phase (only for non-greeting phases)
         if state.current_phase != InterviewPhase.GREETING:
             # Check if we've asked enough questions to move to WRAPUP
-            total_questions = len([msg for msg in state.conversation_history 
-                                  if msg.role == "interviewer" and msg.phase != InterviewPhase.GREETING])
+            total_questions = state.conversation_history.total_questions
             
             if total_questions >= 18:  # Ask at least 18 questions
                 # Only move to WRAPUP if user has answered the final question (no pending question)
@@ -601,187 +792,311 @@ class ExcelInterviewAgent:
                 if next_phase != state.current_phase:
                     state.current_phase = next_phase
             
-            # If we just moved to WRAPUP, show evaluation
-            if state.current_phase == InterviewPhase.WRAPUP:
+            # If we just moved to WRAPUP, show evaluation (only once per interview)
+            if state.current_phase == InterviewPhase.WRAPUP and state.final_report is None:
                 # Calculate overall score and detailed feedback
-                total_score = sum(score.get('score', 0) for score in state.evaluation_scores)
-                avg_score = total_score / len(state.evaluation_scores) if state.evaluation_scores else 0
-                
-                # Calculate scores by phase
-                phase_scores = {}
-                for score in state.evaluation_scores:
-                    phase = score.get('phase', 'unknown')
-                    if phase not in phase_scores:
-                        phase_scores[phase] = []
-                    phase_scores[phase].append(score.get('score', 0))
+                phase_scores = defaultdict(list)
+                for phase, score in zip(state.evaluation_phases, state.evaluation_scores):
+                    phase_scores[phase].append(score)
+                avg_score = fmean(state.evaluation_scores) if state.evaluation_scores else 0
                 
                 # Create AI-powered detailed feedback
-                feedback_text = self._generate_ai_final_report(state, avg_score, phase_scores)
+                state.final_report = write_report(self._generate_final_report_stream(state, avg_score, phase_scores))
                 
-                wrapup_message = InterviewMessage(
-                    role="interviewer",
-                    content=feedback_text,
-                    timestamp=datetime.now(),
-                    phase=InterviewPhase.WRAPUP
-                )
-                state.conversation_history.append(wrapup_message)
+                state.conversation_history.append_interviewer(state.final_report, InterviewPhase.WRAPUP, timestamp=now_ns)
         
         return state
 
-def main():
-    st.set_page_config(
-        page_title="Excel Mock Interviewer",
-        page_icon=None,
-        layout="wide"
-    )
-    
-    # Custom CSS for chat interface
-    st.markdown("""
-    <style>
-    .main-header {
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        padding: 20px;
-        border-radius: 10px;
-        margin-bottom: 20px;
-        text-align: center;
-        color: white;
-    }
-    
-    .main-header h1 {
-        margin: 0;
-        font-size: 2.5em;
-        font-weight: bold;
-    }
-    
-    .main-header p {
-        margin: 10px 0 0 0;
-        font-size: 1.2em;
-        opacity: 0.9;
-    }
-    
-    .message {
-        margin: 20px 0;
-        display: flex;
-        align-items: flex-start;
-        animation: fadeIn 0.3s ease-in;
-    }
-    
-    .message.interviewer {
-        justify-content: flex-start;
-    }
+# Static stylesheet for the chat interface
+_INTERVIEW_CSS = """
+<style>
+.main-header {
+    background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
+    padding: 20px;
+    border-radius: 10px;
+    margin-bottom: 20px;
+    text-align: center;
+    color: white;
+}
+
+.main-header h1 {
+    margin: 0;
+    font-size: 2.5em;
+    font-weight: bold;
+}
+
+.main-header p {
+    margin: 10px 0 0 0;
+    font-size: 1.2em;
+    opacity: 0.9;
+}
+
+.message {
+    margin: 20px 0;
+    display: flex;
+    align-items: flex-start;
+    animation: fadeIn 0.3s ease-in;
+    content-visibility: auto;
+    contain-intrinsic-size: auto 120px;
+}
+
+.message.interviewer {
+    justify-content: flex-start;
+}
+
+.message.candidate {
+    justify-content: flex-end;
+}
+
+.message-content {
+    max-width: 75%;
+    padding: 15px 20px;
+    border-radius: 20px;
+    word-wrap: break-word;
+    word-break: break-word;
+    white-space: pre-wrap;
+    position: relative;
+    box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+    line-height: 1.4;
+}
+
+.message.interviewer .message-content {
+    background: linear-gradient(135deg, #e3f2fd 0%, #f8f9fa 100%);
+    border-bottom-left-radius: 6px;
+    margin-left: 15px;
+    color: #1a1a1a !important;
+    border: 1px solid #e0e0e0;
+}
+
+.message.candidate .message-content {
+    background: linear-gradient(135deg, #007bff 0%, #0056b3 100%);
+    color: white !important;
+    border-bottom-right-radius: 6px;
+    margin-right: 15px;
+    border: 1px solid #0056b3;
+}
+
+.message-sender {
+    font-weight: 600;
+    font-size: 0.85em;
+    margin-bottom: 8px;
+    text-transform: uppercase;
+    letter-spacing: 0.5px;
+}
+
+.message.interviewer .message-sender {
+    color: #1976d2 !important;
+}
+
+.message.candidate .message-sender {
+    color: #ffffff !important;
+}
+
+@keyframes fadeIn {
+    from { opacity: 0; transform: translateY(10px); }
+    to { opacity: 1; transform: translateY(0); }
+}
+
+.status-card {
+    background: white;
+    border-radius: 10px;
+    padding: 15px;
+    margin: 10px 0;
+    box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
+    color: #000000 !important;
+}
+</style>
+"""
+
+# Static page header
+_INTERVIEW_HEADER_HTML = """
+<div class="main-header">
+    <h1>Excel Mock Interviewer</h1>
+    <p>Welcome to your Excel technical interview with Sarah Chen</p>
+</div>
+"""
+
+# Stylesheet and header always go out together, so they are sent as one element
+_STATIC_HEAD_HTML = _INTERVIEW_CSS + _INTERVIEW_HEADER_HTML
+
+@st.cache_resource
+def _get_agent() -> ExcelInterviewAgent:
+    """One interview agent per process; it keeps no per-candidate state"""
+    return ExcelInterviewAgent()
+
+# Number of most recent messages rendered outside the "earlier turns" expander
+MESSAGE_WINDOW = 10
+
+# Scripts in st.markdown are never executed, so the scroll runs from a zero-height
+# component iframe against the parent page
+_SCROLL_TO_END_HTML = """
+<script>
+const end = window.parent.document.getElementById("conversation-end");
+if (end) { end.scrollIntoView({behavior: "auto", block: "end"}); }
+</script>
+"""
+
+def _is_evaluation(message: InterviewMessage) -> bool:
+    """Whether the message is the final interview evaluation"""
+    return message.phase == InterviewPhase.WRAPUP and "Interview Complete!" in message.content
+
+# Chat bubble templates; html.escape on the content keeps message text from injecting markup
+_INTERVIEWER_TPL = Template(
+    '<div class="message interviewer"><div>'
+    '<div class="message-sender">Sarah Chen (Interviewer)</div>'
+    '<div class="message-content">$content</div>'
+    '</div></div>'
+)
+_CANDIDATE_TPL = Template(
+    '<div class="message candidate"><div>'
+    '<div class="message-sender">You</div>'
+    '<div class="message-content">$content</div>'
+    '</div></div>'
+)
+
+def _message_html(message: InterviewMessage) -> str:
+    """HTML chat bubble for a regular message"""
+    # Newlines become character references so the bubble stays a single HTML block
+    content = html.escape(message.content).replace("\n", "&#10;")
+    template = _INTERVIEWER_TPL if message.role == "interviewer" else _CANDIDATE_TPL
+    return template.substitute(content=content)
+
+def _bubble_html(history: ConversationLog) -> List[Optional[str]]:
+    """Bubble HTML per message (None for the evaluation), rendering only messages new since the last run"""
+    # Messages never change once appended, so their HTML is kept for the life of the conversation
+    cached = st.session_state.get("bubble_html")
+    if cached is None or cached[0] is not history:
+        cached = (history, [])
+        st.session_state.bubble_html = cached
+    bubbles = cached[1]
+    for message in history[len(bubbles):]:
+        bubbles.append(None if _is_evaluation(message) else _message_html(message))
+    return bubbles
+
+def _render_messages(messages, bubbles):
+    """Render a run of messages as one st.markdown block from their cached bubble HTML"""
+    html_parts = []
+    evaluation = None
+    for message, bubble in zip(messages, bubbles):
+        if bubble is None:
+            evaluation = message
+        else:
+            html_parts.append(bubble)
     
-    .message.candidate {
-        justify-content: flex-end;
-    }
+    if html_parts:
+        st.markdown("".join(html_parts), unsafe_allow_html=True)
     
-    .message-content {
-        max-width: 75%;
-        padding: 15px 20px;
-        border-radius: 20px;
-        word-wrap: break-word;
-        word-break: break-word;
-        white-space: pre-wrap;
-        position: relative;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        line-height: 1.4;
-    }
+    # The evaluation is always the last message, so it can follow the batched bubbles
+    if evaluation:
+        # Display evaluation as plain markdown in a single chat element
+        with st.chat_message("assistant"):
+            st.markdown(
+                "### Interview Evaluation\n\n"
+                "**From:** Sarah Chen (Interviewer)\n\n"
+                f"{evaluation.content}"
+            )
+
+@st.fragment
+def _sidebar(state: Optional[InterviewState]):
+    """Sidebar status card; reruns on its own when its button is used"""
+    st.markdown("### Interview Status")
     
-    .message.interviewer .message-content {
-        background: linear-gradient(135deg, #e3f2fd 0%, #f8f9fa 100%);
-        border-bottom-left-radius: 6px;
-        margin-left: 15px;
-        color: #1a1a1a !important;
-        border: 1px solid #e0e0e0;
-    }
+    if state:
+        # Status card
+        st.markdown(f"""
+        <div class="status-card">
+            <h4>Interview Details</h4>
+            <p><strong>Interviewer:</strong> Sarah Chen</p>
+            <p><strong>Candidate:</strong> {state.candidate_name}</p>
+            <p><strong>Phase:</strong> {state.current_phase.value.title()}</p>
+            <p><strong>Duration:</strong> {_format_duration(state.start_time_ns)}</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        if st.button("End Interview", type="secondary"):
+            st.session_state.interview_state = None
+            st.rerun()
+    else:
+        st.markdown("No active interview")
+
+@st.fragment
+def _conversation(state: InterviewState, agent: ExcelInterviewAgent):
+    """Conversation and response input; typing and sending rerun only this fragment"""
+    st.markdown("### Interview Conversation")
     
-    .message.candidate .message-content {
-        background: linear-gradient(135deg, #007bff 0%, #0056b3 100%);
-        color: white !important;
-        border-bottom-right-radius: 6px;
-        margin-right: 15px;
-        border: 1px solid #0056b3;
-    }
+    # Create a container for messages with auto-scroll
+    messages_container = st.container()
     
-    .message-sender {
-        font-weight: 600;
-        font-size: 0.85em;
-        margin-bottom: 8px;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }
+    with messages_container:
+        # Older turns are collapsed so each rerun only paints the recent window
+        history = state.conversation_history
+        bubbles = _bubble_html(history)
+        earlier_messages = history[:-MESSAGE_WINDOW]
+        if earlier_messages:
+            with st.expander(f"Show earlier turns ({len(earlier_messages)})", expanded=False):
+                _render_messages(earlier_messages, bubbles[:-MESSAGE_WINDOW])
+        
+        _render_messages(history[-MESSAGE_WINDOW:], bubbles[-MESSAGE_WINDOW:])
     
-    .message.interviewer .message-sender {
-        color: #1976d2 !important;
-    }
+    # Auto-scroll only when a new message was appended since the last run
+    history_length = len(state.conversation_history)
+    if history_length > st.session_state.get("rendered_history_length", 0):
+        st.markdown('<div id="conversation-end"></div>', unsafe_allow_html=True)
+        components.html(_SCROLL_TO_END_HTML, height=0)
+    st.session_state.rendered_history_length = history_length
     
-    .message.candidate .message-sender {
-        color: #ffffff !important;
-    }
+    # Slot for the in-progress interviewer turn; only this node changes while a response is processed
+    live_slot = st.empty()
     
-    @keyframes fadeIn {
-        from { opacity: 0; transform: translateY(10px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
-    
-    .evaluation {
-        background: #fff3cd;
-        border: 1px solid #ffeaa7;
-        border-radius: 8px;
-        padding: 8px 12px;
-        margin-top: 8px;
-        font-size: 0.85em;
-        color: #000000 !important;
-    }
+    # Response input section (only show if not in WRAPUP phase)
+    if state.current_phase != InterviewPhase.WRAPUP:
+        st.markdown("### Your Response")
+        
+        # A form reruns only on submit, and clears the text area once the answer is sent
+        with st.form("response_form", clear_on_submit=True):
+            col1, col2 = st.columns([4, 1])
+            
+            with col1:
+                response = st.text_area(
+                    "Type your response here:",
+                    placeholder="Share your thoughts and experience...",
+                    height=100,
+                    key="response_input"
+                )
+            
+            with col2:
+                submitted = st.form_submit_button("Send Response", type="primary", use_container_width=True)
+        
+        if submitted:
+            if response.strip():
+                live_slot.markdown("_Sarah Chen is reviewing your answer..._")
+                # Process the response
+                st.session_state.interview_state = agent.process_candidate_response(
+                    state, response.strip(), write_report=live_slot.write_stream
+                )
+                st.rerun()
+            else:
+                st.error("Please provide an answer before submitting.")
+
+def main():
+    st.set_page_config(
+        page_title="Excel Mock Interviewer",
+        page_icon=None,
+        layout="wide"
+    )
     
-    .status-card {
-        background: white;
-        border-radius: 10px;
-        padding: 15px;
-        margin: 10px 0;
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-        color: #000000 !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    # Custom CSS for chat interface and header
+    st.markdown(_STATIC_HEAD_HTML, unsafe_allow_html=True)
     
-    # Header
-    st.markdown("""
-    <div class="main-header">
-        <h1>Excel Mock Interviewer</h1>
-        <p>Welcome to your Excel technical interview with Sarah Chen</p>
-    </div>
-    """, unsafe_allow_html=True)
+    agent = _get_agent()
     
     # Initialize session state
-    if "agent" not in st.session_state:
-        st.session_state.agent = ExcelInterviewAgent()
-    
     if "interview_state" not in st.session_state:
         st.session_state.interview_state = None
     
     # Sidebar
     with st.sidebar:
-        st.markdown("### Interview Status")
-        
-        if st.session_state.interview_state:
-            state = st.session_state.interview_state
-            
-            # Status card
-            st.markdown(f"""
-            <div class="status-card">
-                <h4>Interview Details</h4>
-                <p><strong>Interviewer:</strong> Sarah Chen</p>
-                <p><strong>Candidate:</strong> {state.candidate_name}</p>
-                <p><strong>Phase:</strong> {state.current_phase.value.title()}</p>
-                <p><strong>Duration:</strong> {_format_duration(state.start_time)}</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            if st.button("End Interview", type="secondary"):
-                st.session_state.interview_state = None
-                st.rerun()
-        else:
-            st.markdown("No active interview")
+        _sidebar(st.session_state.interview_state)
     
     # Main content
     if st.session_state.interview_state is None:
@@ -793,22 +1108,22 @@ def main():
             
             if st.form_submit_button("Start Interview", type="primary"):
                 if candidate_name.strip():
+                    # Read the clock once; the greeting shares the start timestamp
+                    now_ns = time.perf_counter_ns()
+                    
                     # Initialize interview state
                     st.session_state.interview_state = InterviewState(
                         candidate_name=candidate_name.strip(),
                     current_phase=InterviewPhase.GREETING,
-                    conversation_history=[],
-                    start_time=datetime.now()
+                    start_time_ns=now_ns
                 )
                     
                     # Add initial greeting (NO question yet)
-                    greeting_message = InterviewMessage(
-                        role="interviewer",
-                        content=f"Hello {candidate_name.strip()}! It's great to meet you. I'm Sarah, and I'll be conducting your Excel technical interview today. We'll go through about 20 Excel questions covering different skill levels. Are you ready to begin?",
-                        timestamp=datetime.now(),
-                        phase=InterviewPhase.GREETING
+                    st.session_state.interview_state.conversation_history.append_interviewer(
+                        f"Hello {candidate_name.strip()}! It's great to meet you. I'm Sarah, and I'll be conducting your Excel technical interview today. We'll go through about 20 Excel questions covering different skill levels. Are you ready to begin?",
+                        InterviewPhase.GREETING,
+                        timestamp=now_ns
                     )
-                    st.session_state.interview_state.conversation_history.append(greeting_message)
                     
                     # Move to warmup phase but DON'T ask first question yet
                     st.session_state.interview_state.current_phase = InterviewPhase.WARMUP
@@ -817,85 +1132,7 @@ def main():
             else:
                 st.error("Please enter your name to start the interview.")
     else:
-        # Display conversation
-        state = st.session_state.interview_state
-        
-        st.markdown("### Interview Conversation")
-        
-        # Create a container for messages with auto-scroll
-        messages_container = st.container()
-        
-        with messages_container:
-            # Display messages
-            for message in state.conversation_history:
-                if message.role == "interviewer":
-                    # Check if this is an evaluation message
-                    if message.phase == InterviewPhase.WRAPUP and "Interview Complete!" in message.content:
-                        # Display evaluation as simple markdown without HTML containers
-                        st.markdown("---")
-                        st.markdown("### Interview Evaluation")
-                        st.markdown(f"**From:** Sarah Chen (Interviewer)")
-                        st.markdown("")
-                        st.markdown(message.content)
-                        st.markdown("---")
-                    else:
-                        # Display regular message as HTML
-                        st.markdown(f"""
-                        <div class="message interviewer">
-                            <div>
-                                <div class="message-sender">Sarah Chen (Interviewer)</div>
-                                <div class="message-content">
-                                    {message.content}
-                                </div>
-                            </div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                else:
-                    st.markdown(f"""
-                    <div class="message candidate">
-                        <div>
-                            <div class="message-sender">You</div>
-                            <div class="message-content">
-                                {message.content}
-                            </div>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-        
-        # Add auto-scroll script
-        st.markdown("""
-        <script>
-        // Auto-scroll to bottom of messages
-        window.scrollTo(0, document.body.scrollHeight);
-        </script>
-        """, unsafe_allow_html=True)
-        
-        # Response input section (only show if not in WRAPUP phase)
-        if state.current_phase != InterviewPhase.WRAPUP:
-            st.markdown("### Your Response")
-            
-            col1, col2 = st.columns([4, 1])
-            
-            with col1:
-                # Use a dynamic key to clear input after submission
-                input_key = f"response_input_{len(state.conversation_history)}"
-                response = st.text_area(
-                    "Type your response here:",
-                    placeholder="Share your thoughts and experience...",
-                    height=100,
-                    key=input_key
-                )
-        
-            with col2:
-                if st.button("Send Response", type="primary", use_container_width=True):
-                    if response.strip():
-                        # Process the response
-                        st.session_state.interview_state = st.session_state.agent.process_candidate_response(
-                            state, response.strip()
-                        )
-                        st.rerun()
-                    else:
-                        st.error("Please provide an answer before submitting.")
+        _conversation(st.session_state.interview_state, agent)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file